@@ -1,18 +1,140 @@
 #!/usr/bin/env python3
-import json
+import asyncio
+import atexit
+import gzip
 import logging
-from datetime import datetime
-from typing import Dict, List, Any
+import os
+import queue
+import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, List, Any, Optional
+from urllib.parse import urlencode
 import yaml
 
+# Loader oparty na libyaml (C) jest znacznie szybszy; czysto pythonowy jako zapasowy
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 try:
-    from serpapi import GoogleSearch
+    import aiohttp
+    import orjson
+    from aiolimiter import AsyncLimiter
 except ImportError:
-    print("Błąd: Biblioteka google-search-results nie jest zainstalowana.")
-    print("Zainstaluj ją używając: pip install google-search-results")
+    print("Błąd: Biblioteki aiohttp, orjson i aiolimiter nie są zainstalowane.")
+    print("Zainstaluj je używając: pip install aiohttp orjson aiolimiter")
     exit(1)
 
+# Opcjonalnie: simdjson parsuje odpowiedzi leniwie, bez budowania całego drzewa obiektów
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+
+
+def parse_json(body: bytes) -> Any:
+    """Parsuje odpowiedź JSON - leniwie przez simdjson jeśli jest dostępny, w przeciwnym razie przez orjson"""
+    if simdjson is not None:
+        # Osobny parser na każdą odpowiedź - zapytania są współbieżne, a parser simdjson
+        # nie może być ponownie użyty, dopóki istnieją widoki na poprzedni dokument
+        return simdjson.Parser().parse(body)
+    return orjson.loads(body)
+
+
+def materialize(value: Any) -> Any:
+    """Zamienia leniwy widok simdjson na zwykłe obiekty Pythona przed zapisem"""
+    if simdjson is not None:
+        if isinstance(value, simdjson.Array):
+            return value.as_list()
+        if isinstance(value, simdjson.Object):
+            return value.as_dict()
+    return value
+
+
+# Klucze trendu w pliku wyjściowym, w kolejności kolumn TrendBatch
+TREND_FIELDS = ('query', 'search_volume', 'increase_percentage', 'active',
+                'categories', 'related_queries', 'start_timestamp')
+
+
+@dataclass(slots=True)
+class TrendBatch:
+    """Trendy jednego regionu przechowywane kolumnowo - jedna lista na pole zamiast słownika na trend"""
+    queries: List[str] = field(default_factory=list)
+    search_volumes: List[int] = field(default_factory=list)
+    increase_percentages: List[int] = field(default_factory=list)
+    active: List[bool] = field(default_factory=list)
+    categories: List[list] = field(default_factory=list)
+    related_queries: List[list] = field(default_factory=list)
+    start_timestamps: List[int] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.queries)
+    
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Odtwarza trendy jako słowniki (dotychczasowy format JSON)"""
+        for row in zip(self.queries, self.search_volumes, self.increase_percentages, self.active,
+                       self.categories, self.related_queries, self.start_timestamps):
+            yield dict(zip(TREND_FIELDS, row))
+
+
+def json_default(obj: Any) -> Any:
+    """Serializuje obiekty nieobsługiwane natywnie przez orjson"""
+    if isinstance(obj, TrendBatch):
+        return list(obj.rows())
+    # Niezmaterializowany widok simdjson - zapisujemy jego zawartość, a nie reprezentację tekstową
+    if simdjson is not None and isinstance(obj, (simdjson.Array, simdjson.Object)):
+        return materialize(obj)
+    return str(obj)
+
+
+class ResponseCache:
+    """Trwały cache odpowiedzi SerpAPI w SQLite z czasem wygaśnięcia (TTL)"""
+    
+    def __init__(self, path: str, ttl_minutes: float):
+        self.ttl = ttl_minutes * 60
+        # Połączenie używane z wątków roboczych (asyncio.to_thread) - dostęp serializowany blokadą
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, created REAL NOT NULL, body BLOB NOT NULL)"
+        )
+    
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        # Klucz API nie wpływa na wynik, więc nie jest częścią klucza cache
+        return urlencode(sorted((k, v) for k, v in params.items() if k != 'api_key'))
+    
+    def get(self, params: Dict[str, Any]) -> Optional[bytes]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body FROM responses WHERE key = ? AND created > ?",
+                (self.make_key(params), time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, params: Dict[str, Any], body: bytes):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, created, body) VALUES (?, ?, ?)",
+                (self.make_key(params), time.time(), body)
+            )
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
 
 class TrendsCollector:
     def __init__(self, config_file: str = "config.yaml"):
@@ -20,12 +142,45 @@ class TrendsCollector:
         self.api_key = self.config.get('serpapi_key')
         if not self.api_key:
             raise ValueError("Brak serpapi_key w pliku konfiguracyjnym!")
+        
+        # Wartości konfiguracji odczytywane raz, zamiast przy każdym regionie i trendzie
+        trending_config = self.config.get('trending_searches', {})
+        # Puste 'keywords:' w YAML daje None - traktujemy je jak pustą listę
+        self.keywords = self.config.get('keywords') or []
+        self.regions = self.config['regions']
+        self.timeframe = self.config.get('timeframe', 'today 3-m')
+        self.trending_enabled = trending_config.get('enabled', False)
+        self.trend_count = trending_config.get('count', 20)
+        
+        # Stałe części parametrów zapytań - dla każdego regionu dokładany jest tylko kod geo
+        self._trending_params = {
+            "api_key": self.api_key,
+            "engine": "google_trends_trending_now"
+        }
+        self._interest_params = {
+            "api_key": self.api_key,
+            "engine": "google_trends",
+            "q": ",".join(self.keywords),
+            "date": self.timeframe
+        }
+        
+        # Limit zapytań na sekundę zgodny z limitami SerpAPI (zamiast stałych opóźnień)
+        self.limiter = AsyncLimiter(self.config.get('rate_limit_rps', 5), 1)
+        
+        # Liczniki bieżącego uruchomienia - zapytania, które dotarły do SerpAPI, i trafienia w cache
+        self.api_requests = 0
+        self.cache_hits = 0
+        
+        cache_ttl = self.config.get('cache_ttl_min', 30)
+        self.cache = ResponseCache(self.config.get('cache_file', 'trends_cache.sqlite'), cache_ttl) if cache_ttl else None
+        
+        # Wątek logowania uruchamiany na końcu - błąd konfiguracji wyżej nie zostawi go działającego
         self.setup_logging()
     
     def load_config(self, config_file: str) -> Dict[str, Any]:
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=SafeLoader)
         except FileNotFoundError:
             logging.error(f"Plik konfiguracyjny {config_file} nie został znaleziony")
             raise
@@ -34,61 +189,126 @@ class TrendsCollector:
             raise
     
     def setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('trends_collector.log'),
-                logging.StreamHandler()
-            ]
-        )
+        # Zapis do pliku i na konsolę odbywa się w osobnym wątku - logowanie tylko wrzuca rekord do kolejki
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers = [
+            logging.FileHandler('trends_collector.log', delay=True),
+            logging.StreamHandler()
+        ]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.SimpleQueue()
+        self.log_handler = QueueHandler(log_queue)
+        # Pełny format (z czasem) nakładają handlery listenera, kolejka przenosi tylko treść komunikatu
+        logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[self.log_handler])
+        
+        # basicConfig nic nie zmienia, jeśli logowanie było już skonfigurowane - wtedy listener jest zbędny
+        self.log_listener = None
+        if self.log_handler in logging.getLogger().handlers:
+            self.log_listener = QueueListener(log_queue, *handlers)
+            self.log_listener.start()
+            # Wątek listenera jest demonem - bez close() ostatnie rekordy zginęłyby przy wyjściu
+            atexit.register(self.close)
+    
+    def close(self):
+        """Zamyka cache, opróżnia kolejkę logów i odłącza logowanie kolektora; kolejne wywołania nic nie robią"""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.log_listener is None:
+            return
+        atexit.unregister(self.close)
+        logging.getLogger().removeHandler(self.log_handler)
+        self.log_listener.stop()
+        for handler in self.log_listener.handlers:
+            handler.close()
+        self.log_listener = None
+    
+    def __enter__(self):
+        return self
     
-    def collect_trending_searches(self, region_code: str, region_name: str) -> Dict[str, Any]:
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    async def _fetch(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                     params: Dict[str, Any]) -> Any:
+        """Wykonuje zapytanie do SerpAPI przez współdzieloną sesję, ponawiając błędy przejściowe"""
+        # Trafienie w cache nie zużywa limitu SerpAPI ani miejsca w semaforze
+        if self.cache:
+            # Odczyt i zapis SQLite (z fsync przy commicie) w wątku, żeby nie blokować pętli zdarzeń
+            body = await asyncio.to_thread(self.cache.get, params)
+            if body is not None:
+                logging.info(f"Odpowiedź SerpAPI pobrana z cache ({params.get('engine')}, {params.get('geo')})")
+                self.cache_hits += 1
+                return parse_json(body)
+        
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                # Semafor ogranicza liczbę równoległych zapytań, limiter ich częstotliwość
+                async with semaphore, self.limiter:
+                    async with session.get(SERPAPI_URL, params=params) as resp:
+                        self.api_requests += 1
+                        status = resp.status
+                        if status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                            body = await resp.read()
+                            break
+                        logging.warning(f"SerpAPI zwróciło status {status}, ponawianie zapytania")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == MAX_RETRIES:
+                    raise
+                logging.warning("Błąd połączenia z SerpAPI, ponawianie zapytania")
+            await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
+        
+        results = parse_json(body)
+        # Błędy API nie trafiają do cache, żeby kolejne uruchomienie je ponowiło;
+        # zapis poza semaforem, żeby nie blokować miejsca na kolejne zapytanie
+        if self.cache and status == 200 and 'error' not in results:
+            await asyncio.to_thread(self.cache.set, params, body)
+        return results
+    
+    async def collect_trending_searches(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                        region_code: str, region_name: str) -> Dict[str, Any]:
         """Zbiera trending searches z SerpAPI Google Trends"""
         try:
             logging.info(f"Zbieranie trending searches dla regionu: {region_name} ({region_code})")
             
             # Używamy regionalnych trending searches z parametrem geo
-            params = {
-                "api_key": self.api_key,
-                "engine": "google_trends_trending_now",
-                "geo": region_code
-            }
+            params = {**self._trending_params, "geo": region_code}
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = await self._fetch(session, semaphore, params)
             
             trending_data = {
                 'region_name': region_name,
                 'region_code': region_code,
                 'collection_time': datetime.now().isoformat(),
-                'trending_searches': [],
+                'trending_searches': TrendBatch(),
                 'source': 'SerpAPI Google Trends',
                 'note': 'Global trending searches (region-specific may not be available)'
             }
             
             if 'trending_searches' in results:
-                count = self.config.get('trending_searches', {}).get('count', 20)
-                trending_list = results['trending_searches'][:count]
+                count = self.trend_count
+                trending_list = results['trending_searches']
+                batch = trending_data['trending_searches']
                 
-                for trend in trending_list:
-                    trend_data = {
-                        'query': trend.get('query', ''),
-                        'search_volume': trend.get('search_volume', 0),
-                        'increase_percentage': trend.get('increase_percentage', 0),
-                        'active': trend.get('active', True),
-                        'categories': trend.get('categories', []),
-                        'related_queries': trend.get('trend_breakdown', []),
-                        'start_timestamp': trend.get('start_timestamp', 0)
-                    }
-                    trending_data['trending_searches'].append(trend_data)
+                # Dostęp po indeksie - wycinek tablicy simdjson materializowałby wszystkie pola
+                for i in range(min(count, len(trending_list))):
+                    trend = trending_list[i]
+                    batch.queries.append(trend.get('query', ''))
+                    batch.search_volumes.append(trend.get('search_volume', 0))
+                    batch.increase_percentages.append(trend.get('increase_percentage', 0))
+                    batch.active.append(trend.get('active', True))
+                    batch.categories.append(materialize(trend.get('categories', [])))
+                    batch.related_queries.append(materialize(trend.get('trend_breakdown', [])))
+                    batch.start_timestamps.append(trend.get('start_timestamp', 0))
                 
                 logging.info(f"Pomyślnie zebrano {len(trending_data['trending_searches'])} trending searches dla regionu: {region_name}")
             else:
                 logging.warning(f"Brak danych trending searches dla regionu: {region_name}")
                 trending_data['error'] = 'Brak danych w odpowiedzi SerpAPI'
                 if 'error' in results:
-                    trending_data['api_error'] = results['error']
+                    trending_data['api_error'] = materialize(results['error'])
             
             return trending_data
             
@@ -102,38 +322,24 @@ class TrendsCollector:
                 'source': 'SerpAPI Google Trends'
             }
     
-    def collect_interest_over_time(self, keywords: List[str], region_code: str, region_name: str) -> Dict[str, Any]:
+    async def collect_interest_over_time(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                         keywords: List[str], region_code: str, region_name: str) -> Dict[str, Any]:
         """Zbiera interest over time z SerpAPI Google Trends"""
         try:
             logging.info(f"Zbieranie interest over time dla regionu: {region_name} ({region_code})")
             
-            geo_mapping = {
-                'PL': 'PL',
-                'US': 'US', 
-                'DE': 'DE',
-                'GB': 'GB',
-                'FR': 'FR'
-            }
-            
-            geo_code = geo_mapping.get(region_code, region_code)
+            params = {**self._interest_params, "geo": region_code}
+            if keywords is not self.keywords:
+                params["q"] = ",".join(keywords)
             
-            params = {
-                "api_key": self.api_key,
-                "engine": "google_trends",
-                "q": ",".join(keywords),
-                "geo": geo_code,
-                "date": self.config.get('timeframe', 'today 3-m')
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = await self._fetch(session, semaphore, params)
             
             interest_data = {
                 'region_name': region_name,
                 'region_code': region_code,
                 'collection_time': datetime.now().isoformat(),
                 'keywords': keywords,
-                'timeframe': self.config.get('timeframe', 'today 3-m'),
+                'timeframe': self.timeframe,
                 'interest_over_time': {},
                 'related_topics': {},
                 'related_queries': {},
@@ -143,27 +349,28 @@ class TrendsCollector:
             # Interest over time
             if 'interest_over_time' in results:
                 timeline = results['interest_over_time'].get('timeline_data', [])
+                interest_over_time = interest_data['interest_over_time']
                 for data_point in timeline:
                     date_str = data_point.get('date', '')
                     values = data_point.get('values', [])
                     
                     if date_str and values:
-                        interest_data['interest_over_time'][date_str] = {}
-                        for i, keyword in enumerate(keywords):
-                            if i < len(values):
-                                interest_data['interest_over_time'][date_str][keyword] = values[i].get('value', 0)
+                        # zip kończy się na krótszej sekwencji, więc nadmiarowe słowa kluczowe są pomijane
+                        interest_over_time[date_str] = {
+                            keyword: value.get('value', 0) for keyword, value in zip(keywords, values)
+                        }
             
             # Related topics
             if 'related_topics' in results:
                 for keyword in keywords:
                     if keyword in results['related_topics']:
-                        interest_data['related_topics'][keyword] = results['related_topics'][keyword]
+                        interest_data['related_topics'][keyword] = materialize(results['related_topics'][keyword])
             
             # Related queries  
             if 'related_queries' in results:
                 for keyword in keywords:
                     if keyword in results['related_queries']:
-                        interest_data['related_queries'][keyword] = results['related_queries'][keyword]
+                        interest_data['related_queries'][keyword] = materialize(results['related_queries'][keyword])
             
             logging.info(f"Pomyślnie zebrano interest over time dla regionu: {region_name}")
             return interest_data
@@ -178,17 +385,17 @@ class TrendsCollector:
                 'source': 'SerpAPI Google Trends'
             }
     
-    def collect_all_trends(self) -> Dict[str, Any]:
-        keywords = self.config['keywords']
-        regions = self.config['regions']
-        trending_enabled = self.config.get('trending_searches', {}).get('enabled', False)
+    async def collect_all_trends(self) -> Dict[str, Any]:
+        keywords = self.keywords
+        regions = self.regions
+        trending_enabled = self.trending_enabled
         
         all_data = {
             'metadata': {
                 'collection_time': datetime.now().isoformat(),
                 'keywords': keywords,
                 'total_regions': len(regions),
-                'timeframe': self.config.get('timeframe', 'today 3-m'),
+                'timeframe': self.timeframe,
                 'trending_searches_enabled': trending_enabled,
                 'source': 'SerpAPI Google Trends',
                 'api_usage_note': 'Each request uses your SerpAPI quota'
@@ -196,22 +403,23 @@ class TrendsCollector:
             'trending_searches_data': []
         }
         
-        for i, region in enumerate(regions):
-            region_name = region['name']
-            region_code = region['code']
-            
-            logging.info(f"Przetwarzanie regionu {i+1}/{len(regions)}: {region_name}")
+        # Zbieranie trending searches jeśli włączone (interest over time wyłączone)
+        if trending_enabled:
+            semaphore = asyncio.Semaphore(self.config.get('concurrency', 4))
+            connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            # Krótki limit na nawiązanie połączenia i osobny na odczyt odpowiedzi - zawieszone zapytanie trafia do ponowień
+            timeout = aiohttp.ClientTimeout(total=30, sock_connect=3, sock_read=15)
             
-            # Interest over time wyłączone - zbieramy tylko trending searches
+            # Jedna sesja dla wszystkich regionów - współdzielone połączenie TLS z serpapi.com
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        tg.create_task(self.collect_trending_searches(session, semaphore, region['code'], region['name']))
+                        for region in regions
+                    ]
             
-            # Zbieranie trending searches jeśli włączone
-            if trending_enabled:
-                trending_data = self.collect_trending_searches(region_code, region_name)
-                all_data['trending_searches_data'].append(trending_data)
-                time.sleep(2)  # Opóźnienie między zapytaniami
-            
-            if i < len(regions) - 1:
-                time.sleep(3)  # Dłuższe opóźnienie między regionami
+            # Zachowujemy kolejność regionów z konfiguracji
+            all_data['trending_searches_data'] = [task.result() for task in tasks]
         
         return all_data
     
@@ -219,29 +427,59 @@ class TrendsCollector:
         if filename is None:
             filename = self.config.get('output_file', 'trends_data.json')
         
+        # Sufiks przed rozszerzeniem - nazwa zawsze różni się od pliku pełnego, więc oba mogą być zapisywane równolegle
+        root, ext = os.path.splitext(filename)
+        simple_filename = f"{root}_simple{ext}"
+        
+        # Domyślnie zapisujemy skompresowany JSON (.json.gz) - czysty JSON można włączyć w konfiguracji
+        compress = self.config.get('compress_output', True)
+        if compress:
+            filename += '.gz'
+            simple_filename += '.gz'
+        
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-            logging.info(f"Dane zostały zapisane do pliku: {filename}")
-            
-            # Zapisz uproszczoną wersję dla agenta AI
-            simple_data = self.create_simple_format(data)
-            simple_filename = filename.replace('.json', '_simple.json')
-            with open(simple_filename, 'w', encoding='utf-8') as f:
-                json.dump(simple_data, f, ensure_ascii=False, indent=2)
-            logging.info(f"Uproszczone dane dla agenta AI zapisane do: {simple_filename}")
+            # Oba pliki są niezależne - zapisujemy je równolegle
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                full_future = executor.submit(
+                    self._write_json, filename, data, compress,
+                    orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+                )
+                # Uproszczona wersja dla agenta AI
+                simple_future = executor.submit(self._write_simple_json, simple_filename, data, compress)
+                
+                full_future.result()
+                logging.info(f"Dane zostały zapisane do pliku: {filename}")
+                simple_future.result()
+                logging.info(f"Uproszczone dane dla agenta AI zapisane do: {simple_filename}")
             
         except Exception as e:
             logging.error(f"Błąd podczas zapisywania do pliku {filename}: {str(e)}")
             raise
 
-    def create_simple_format(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Tworzy uproszczony format JSON tylko z trendującymi hasłami dla agenta AI"""
-        simple_data = {
-            'collection_time': data.get('metadata', {}).get('collection_time'),
-            'regions': []
-        }
-        
+    @staticmethod
+    def _open_output(path: str, compress: bool):
+        # Poziom 3 to dobry kompromis między szybkością a stopniem kompresji
+        return gzip.open(path, 'wb', compresslevel=3) if compress else open(path, 'wb')
+    
+    def _write_json(self, path: str, obj: Any, compress: bool, option: int = orjson.OPT_INDENT_2):
+        with self._open_output(path, compress) as f:
+            f.write(orjson.dumps(obj, option=option, default=json_default))
+    
+    def _write_simple_json(self, path: str, data: Dict[str, Any], compress: bool):
+        # Regiony są kodowane i zapisywane po kolei - uproszczona struktura nie jest budowana w całości w pamięci
+        collection_time = data.get('metadata', {}).get('collection_time')
+        with self._open_output(path, compress) as f:
+            f.write(b'{"collection_time":')
+            f.write(orjson.dumps(collection_time))
+            f.write(b',"regions":[')
+            for i, region_trends in enumerate(self._iter_simple_regions(data)):
+                if i:
+                    f.write(b',')
+                f.write(orjson.dumps(region_trends))
+            f.write(b']}')
+    
+    def _iter_simple_regions(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Generuje uproszczone dane kolejnych regionów"""
         for region_data in data.get('trending_searches_data', []):
             region_trends = {
                 'region_name': region_data.get('region_name'),
@@ -249,39 +487,53 @@ class TrendsCollector:
                 'trending_queries': []
             }
             
-            for trend in region_data.get('trending_searches', []):
-                region_trends['trending_queries'].append({
-                    'query': trend.get('query'),
-                    'search_volume': trend.get('search_volume'),
-                    'increase_percentage': trend.get('increase_percentage'),
-                    'category': trend.get('categories', [{}])[0].get('name', 'Unknown') if trend.get('categories') else 'Unknown'
+            batch = region_data.get('trending_searches', TrendBatch())
+            append = region_trends['trending_queries'].append
+            for query, search_volume, increase_percentage, categories in zip(
+                    batch.queries, batch.search_volumes, batch.increase_percentages, batch.categories):
+                append({
+                    'query': query,
+                    'search_volume': search_volume,
+                    'increase_percentage': increase_percentage,
+                    'category': categories[0].get('name', 'Unknown') if categories else 'Unknown'
                 })
             
-            simple_data['regions'].append(region_trends)
-        
-        return simple_data
+            yield region_trends
     
-    def run(self):
+    def create_simple_format(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Tworzy uproszczony format JSON tylko z trendującymi hasłami dla agenta AI"""
+        return {
+            'collection_time': data.get('metadata', {}).get('collection_time'),
+            'regions': list(self._iter_simple_regions(data))
+        }
+    
+    async def run_async(self):
+        self.api_requests = 0
+        self.cache_hits = 0
         try:
             logging.info("Rozpoczynanie zbierania danych Google Trends")
-            data = self.collect_all_trends()
+            data = await self.collect_all_trends()
             self.save_to_json(data)
             logging.info("Zbieranie danych zakończone pomyślnie")
             
-            # Podsumowanie użycia API - tylko trending searches
-            total_requests = len(self.config.get('regions', []))
-            logging.info(f"Wykorzystano około {total_requests} zapytań SerpAPI")
+            # Podsumowanie użycia API - odpowiedzi z cache nie zużywają limitu
+            logging.info(f"Wykorzystano {self.api_requests} zapytań SerpAPI (odpowiedzi z cache: {self.cache_hits})")
             
             return data
         except Exception as e:
             logging.error(f"Błąd podczas wykonywania programu: {str(e)}")
             raise
+    
+    def run(self):
+        """Uruchamia zbieranie danych; po zakończeniu pracy z kolektorem wywołaj close() (lub użyj with)"""
+        return asyncio.run(self.run_async())
 
 
 def main():
     try:
-        collector = TrendsCollector()
-        collector.run()
+        # with wywołuje close(), które opróżnia kolejkę logów przed zakończeniem programu
+        with TrendsCollector() as collector:
+            collector.run()
         print("Program zakończył się pomyślnie. Sprawdź plik z danymi i logi.")
     except Exception as e:
         print(f"Błąd: {str(e)}")